@@ -6,8 +6,12 @@ Environment-based configuration for local development and testing.
 import os
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file once per process tree.
+# Reload/worker processes inherit the populated environment, so they skip
+# re-parsing the file on every spawn.
+if not os.environ.get("SECAAS_ENV_LOADED"):
+    load_dotenv()
+    os.environ["SECAAS_ENV_LOADED"] = "1"
 
 # Database Configuration
 DATABASE_HOST = os.getenv("DATABASE_HOST", "localhost")
@@ -19,9 +23,38 @@ DATABASE_PASSWORD = os.getenv("DATABASE_PASSWORD", "postgres")
 # Build database URL for SQLAlchemy
 DATABASE_URL = f"postgresql://{DATABASE_USER}:{DATABASE_PASSWORD}@{DATABASE_HOST}:{DATABASE_PORT}/{DATABASE_NAME}"
 
+# Async (asyncpg) database URL used by the API; DATABASE_URL (psycopg2)
+# remains for synchronous scripts such as init_db.py
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DATABASE_USER}:{DATABASE_PASSWORD}@{DATABASE_HOST}:{DATABASE_PORT}/{DATABASE_NAME}"
+
+# Connection Pool Configuration
+# Sized for several concurrent API workers sharing one engine. When running
+# behind PgBouncer (transaction pooling, usually port 6432) set
+# DATABASE_PGBOUNCER=true and DATABASE_POOL_PRE_PING=false since PgBouncer
+# already validates server connections.
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", 20))
+DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", 10))
+DATABASE_POOL_TIMEOUT = int(os.getenv("DATABASE_POOL_TIMEOUT", 30))
+DATABASE_POOL_RECYCLE = int(os.getenv("DATABASE_POOL_RECYCLE", 3600))
+DATABASE_POOL_PRE_PING = os.getenv("DATABASE_POOL_PRE_PING", "true").lower() == "true"
+
+# asyncpg caches prepared statements per connection, which breaks under
+# PgBouncer transaction pooling ("prepared statement ... already exists /
+# does not exist"); true disables both the asyncpg and SQLAlchemy caches
+DATABASE_PGBOUNCER = os.getenv("DATABASE_PGBOUNCER", "false").lower() == "true"
+
+# Compiled SQL cache entries per engine (SQLAlchemy default is 500)
+DATABASE_QUERY_CACHE_SIZE = int(os.getenv("DATABASE_QUERY_CACHE_SIZE", 1200))
+
 # Risk Detection Configuration
 RISK_SCORE_THRESHOLD = 70  # Alert trigger threshold
 
+# Seconds before the in-process role policy set is reloaded
+POLICY_CACHE_TTL = int(os.getenv("POLICY_CACHE_TTL", 60))
+
+# Seconds before each API worker reloads its in-memory role baselines
+BASELINE_CACHE_TTL = int(os.getenv("BASELINE_CACHE_TTL", 300))
+
 # Alert Levels Configuration
 ALERT_LEVELS = {
     "LOW": (70, 79),
@@ -37,6 +70,19 @@ RISK_WEIGHTS = {
     "high_frequency": 15         # Lower weight - could be legitimate burst
 }
 
+# Activity Log Batching Configuration
+# When enabled, /logActivity queues the activity log row and a background
+# task writes queued rows in multi-row INSERTs. Alerts are still committed
+# synchronously. Trade-off: rows still queued are lost if the process dies,
+# and the daily frequency check does not yet count them.
+ACTIVITY_LOG_BATCHING = os.getenv("ACTIVITY_LOG_BATCHING", "false").lower() == "true"
+ACTIVITY_LOG_BATCH_SIZE = int(os.getenv("ACTIVITY_LOG_BATCH_SIZE", 500))
+ACTIVITY_LOG_FLUSH_INTERVAL_MS = int(os.getenv("ACTIVITY_LOG_FLUSH_INTERVAL_MS", 100))
+
+# Redis Response Cache Configuration (empty REDIS_URL disables caching)
+REDIS_URL = os.getenv("REDIS_URL", "")
+USER_RISK_CACHE_TTL = int(os.getenv("USER_RISK_CACHE_TTL", 60))  # Seconds
+
 # Application Configuration
 APP_HOST = os.getenv("APP_HOST", "0.0.0.0")
 APP_PORT = int(os.getenv("APP_PORT", 8000))
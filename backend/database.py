@@ -1,43 +1,106 @@
 """
 SECaaS Insider Threat Detection - Database Connection
 
-SQLAlchemy database engine and session management.
+SQLAlchemy async database engine and session management.
 """
-from sqlalchemy import create_engine
+import asyncio
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_scoped_session,
+    async_sessionmaker,
+    create_async_engine
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from backend.config import DATABASE_URL
+from backend.config import (
+    ASYNC_DATABASE_URL,
+    DATABASE_POOL_SIZE,
+    DATABASE_MAX_OVERFLOW,
+    DATABASE_POOL_TIMEOUT,
+    DATABASE_POOL_RECYCLE,
+    DATABASE_POOL_PRE_PING,
+    DATABASE_PGBOUNCER,
+    DATABASE_QUERY_CACHE_SIZE
+)
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
+# Create SQLAlchemy async engine (asyncpg driver)
+engine = create_async_engine(
+    ASYNC_DATABASE_URL,
     echo=False,  # Set to True for SQL debugging
-    pool_pre_ping=True,  # Enable connection health checks
-    pool_recycle=3600  # Recycle connections after 1 hour
+    pool_size=DATABASE_POOL_SIZE,  # Persistent connections kept open
+    max_overflow=DATABASE_MAX_OVERFLOW,  # Extra connections allowed under burst load
+    pool_timeout=DATABASE_POOL_TIMEOUT,  # Seconds to wait for a free connection
+    pool_pre_ping=DATABASE_POOL_PRE_PING,  # Enable connection health checks
+    pool_recycle=DATABASE_POOL_RECYCLE,  # Recycle connections after 1 hour
+    query_cache_size=DATABASE_QUERY_CACHE_SIZE,  # Compiled SQL statements kept for reuse
+    # No prepared statement caching behind PgBouncer transaction pooling
+    connect_args={"statement_cache_size": 0, "prepared_statement_cache_size": 0} if DATABASE_PGBOUNCER else {}
+)
+
+# Create SessionLocal factory for async database sessions.
+# expire_on_commit=False keeps loaded attributes readable after commit
+# without an implicit (and, under asyncio, illegal) lazy refresh.
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
 )
 
-# Create SessionLocal class for database sessions
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Request scope marker set by the HTTP middleware in main.py.
+# The middleware hands the request to the endpoint in a child task, which
+# inherits this context, so both resolve the same scoped session.
+_request_scope: ContextVar[Optional[object]] = ContextVar("request_scope", default=None)
+
+def _session_scope():
+    """Key sessions by the active request, falling back to the current task."""
+    scope = _request_scope.get()
+    return scope if scope is not None else asyncio.current_task()
+
+# Scoped session registry shared by all endpoints
+ScopedSession = async_scoped_session(SessionLocal, scopefunc=_session_scope)
 
 # Create Base class for models
 Base = declarative_base()
 
-def get_db():
+async def get_db():
     """
     Dependency function to get database session.
-    Used with FastAPI's Depends() for request-scoped sessions.
+    Yields a standalone session closed after use; kept for scripts and tests.
     """
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def init_db():
+async def get_scoped_db() -> AsyncSession:
     """
-    Initialize database tables.
-    Creates all tables defined in models.
+    Dependency function returning the current request's scoped session.
+    The session is released by the request middleware in main.py.
     """
-    from backend.models import role, user, activity_log, role_baseline, alert
-    Base.metadata.create_all(bind=engine)
+    return ScopedSession()
 
+def begin_request_scope():
+    """Open a new session scope for an incoming request; returns a reset token."""
+    return _request_scope.set(object())
+
+def end_request_scope(token) -> None:
+    """Close the request scope opened by begin_request_scope."""
+    _request_scope.reset(token)
+
+# Set once create_all has run in this process, so repeated init_db() calls
+# skip the per-table catalog introspection
+_db_initialized = False
+
+async def init_db():
+    """
+    Initialize database tables.
+    Creates all tables defined in models (once per process).
+    """
+    global _db_initialized
+    if _db_initialized:
+        return
+    
+    from backend import models  # Registers every model table on Base.metadata
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    _db_initialized = True
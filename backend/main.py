@@ -12,17 +12,88 @@ This module implements the three core APIs:
 Author: SECaaS System
 Version: 1.0.0
 """
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Optional
-from fastapi import FastAPI, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from typing import Annotated, List, Optional, Tuple
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter, ValidationError
+import redis.asyncio as redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, select, tuple_
 
-from backend.config import APP_HOST, APP_PORT
-from backend.database import get_db, init_db
+from backend.config import (
+    APP_HOST,
+    APP_PORT,
+    ALERT_LEVELS,
+    REDIS_URL,
+    USER_RISK_CACHE_TTL,
+    ACTIVITY_LOG_BATCHING,
+    ACTIVITY_LOG_BATCH_SIZE,
+    ACTIVITY_LOG_FLUSH_INTERVAL_MS
+)
+from backend.database import (
+    engine,
+    SessionLocal,
+    ScopedSession,
+    get_scoped_db,
+    init_db,
+    begin_request_scope,
+    end_request_scope
+)
 from backend.models import User, Role, Alert
-from backend.schemas import ActivityLogRequest, ActivityLogResponse, AlertResponse, UserRiskResponse
-from backend.services.risk_detector import RiskDetector, get_risk_detector
+from backend.schemas import ActivityLogRequest, ActivityLogResponse, AlertFilter, AlertResponse, UserRiskResponse, to_naive_utc
+from backend.services.risk_detector import (
+    USER_NOT_FOUND_REASON,
+    RiskDetector,
+    get_risk_detector,
+    load_policies,
+    load_role_baselines
+)
+from backend.services.activity_batcher import ActivityLogBatcher
+
+# Accepted values for the /getAlerts alert_level filter
+_VALID_ALERT_LEVELS = frozenset(ALERT_LEVELS)
+
+# Serializer for /getAlerts pages, built once; validates the rows and dumps
+# them to JSON bytes in a single pass through pydantic-core
+_ALERT_LIST_ADAPTER = TypeAdapter(List[AlertResponse])
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up shared resources before serving and release them on shutdown."""
+    app.state.engine = engine
+    await init_db()
+    
+    # Optional Redis response cache for /getUserRisk
+    app.state.redis = redis.from_url(REDIS_URL) if REDIS_URL else None
+    
+    # Optional background writer for batched activity log inserts
+    app.state.activity_batcher = None
+    if ACTIVITY_LOG_BATCHING:
+        app.state.activity_batcher = ActivityLogBatcher(
+            SessionLocal,
+            batch_size=ACTIVITY_LOG_BATCH_SIZE,
+            flush_interval=ACTIVITY_LOG_FLUSH_INTERVAL_MS / 1000
+        )
+        app.state.activity_batcher.start()
+    
+    # Warm the in-process role policies and baselines used by risk checks
+    async with SessionLocal() as db:
+        await load_policies(db)
+        await load_role_baselines(db)
+    print("SECaaS Insider Threat Detection API started successfully")
+    
+    yield
+    
+    # Flush queued activity logs, then release external connections
+    if app.state.activity_batcher is not None:
+        await app.state.activity_batcher.stop()
+    if app.state.redis is not None:
+        await app.state.redis.aclose()
+    await engine.dispose()
+
 
 # Initialize FastAPI application
 app = FastAPI(
@@ -59,15 +130,65 @@ app = FastAPI(
     """,
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,  # orjson encodes datetimes/floats in C
+    lifespan=lifespan
 )
 
-# Initialize database tables on startup
-@app.on_event("startup")
-def startup_event():
-    """Initialize database tables on application startup."""
-    init_db()
-    print("SECaaS Insider Threat Detection API started successfully")
+@app.middleware("http")
+async def db_session_middleware(request: Request, call_next):
+    """Scope one database session per request and release it afterwards."""
+    token = begin_request_scope()
+    try:
+        return await call_next(request)
+    finally:
+        await ScopedSession.remove()
+        end_request_scope(token)
+
+
+# =============================================================================
+# User Risk Response Cache
+# =============================================================================
+
+def _user_risk_cache_key(user_id: str) -> str:
+    """Redis key holding the cached /getUserRisk response for a user."""
+    return f"risk:{user_id}"
+
+
+async def get_cached_user_risk(user_id: str) -> Optional[UserRiskResponse]:
+    """Return the cached risk posture for a user, or None on a miss."""
+    if app.state.redis is None:
+        return None
+    try:
+        cached = await app.state.redis.get(_user_risk_cache_key(user_id))
+    except redis.RedisError as e:
+        print(f"[CACHE] Redis read failed, falling back to database: {e}")
+        return None
+    return UserRiskResponse.model_validate_json(cached) if cached else None
+
+
+async def cache_user_risk(response: UserRiskResponse) -> None:
+    """Store a user's risk posture for USER_RISK_CACHE_TTL seconds."""
+    if app.state.redis is None:
+        return
+    try:
+        await app.state.redis.setex(
+            _user_risk_cache_key(response.user_id),
+            USER_RISK_CACHE_TTL,
+            response.model_dump_json()
+        )
+    except redis.RedisError as e:
+        print(f"[CACHE] Redis write failed: {e}")
+
+
+async def invalidate_user_risk(user_id: str) -> None:
+    """Drop a user's cached risk posture after a new alert."""
+    if app.state.redis is None:
+        return
+    try:
+        await app.state.redis.delete(_user_risk_cache_key(user_id))
+    except redis.RedisError as e:
+        print(f"[CACHE] Redis invalidation failed: {e}")
 
 
 # =============================================================================
@@ -94,27 +215,44 @@ def startup_event():
     9. Generate alert if risk score >= threshold (70)
     
     Returns the processing status, calculated risk score, and whether an alert was generated.
-    """
+    """,
+    # The body is parsed in the handler; keep it documented in OpenAPI
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": ActivityLogRequest.model_json_schema()}}
+        }
+    }
 )
-def log_activity(
-    activity: ActivityLogRequest,
-    db: Session = Depends(get_db)
+async def log_activity(
+    request: Request,
+    db: AsyncSession = Depends(get_scoped_db)
 ) -> ActivityLogResponse:
     """
     Process an activity log entry with threat detection.
     
     Args:
-        activity: Activity log data including user_id, action, resource, etc.
+        request: Request whose JSON body holds the activity (user_id, action,
+                 resource, etc.)
         db: Database session
         
     Returns:
         ActivityLogResponse with status, risk_score, and alert_generated flag
     """
+    # Validate the raw body in pydantic-core (no json.loads + dict pass);
+    # invalid bodies still get FastAPI's standard 422 response
+    try:
+        activity = ActivityLogRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)
+        ])
+    
     # Get risk detector service
     detector = get_risk_detector(db)
     
     # Calculate risk score based on role-based behavior profiling
-    risk_score, reasons = detector.calculate_risk_score(
+    risk_score, reasons = await detector.calculate_risk_score(
         user_id=activity.user_id,
         action=activity.action,
         resource=activity.resource,
@@ -122,15 +260,23 @@ def log_activity(
         access_time=activity.access_time
     )
     
-    # Create activity log entry
-    detector.create_activity_log(
-        user_id=activity.user_id,
-        action=activity.action,
-        resource=activity.resource,
-        records_accessed=activity.records_accessed,
-        access_time=activity.access_time,
-        source_ip=activity.source_ip
-    )
+    # Create activity log entry: queued for a background batch when enabled,
+    # otherwise committed together with any alert below. Unknown users are
+    # never queued: their row would fail the user_id foreign key.
+    batcher = app.state.activity_batcher
+    if batcher is not None:
+        if reasons != [USER_NOT_FOUND_REASON]:
+            batcher.enqueue(activity.model_dump())
+    else:
+        await detector.create_activity_log(
+            user_id=activity.user_id,
+            action=activity.action,
+            resource=activity.resource,
+            records_accessed=activity.records_accessed,
+            access_time=activity.access_time,
+            source_ip=activity.source_ip,
+            commit=False
+        )
     
     # Check if alert should be generated
     alert_generated = False
@@ -141,17 +287,26 @@ def log_activity(
         alert_level = detector.get_alert_level(risk_score)
         
         # Create alert entry
-        detector.create_alert(
+        await detector.create_alert(
             user_id=activity.user_id,
             risk_score=risk_score,
             alert_level=alert_level,
-            reasons=reasons
+            reasons=reasons,
+            commit=False
         )
-        
+    
+    # Persist the activity log and alert in a single transaction
+    # (nothing was written when the log was queued and no alert fired)
+    if batcher is None or alert_generated:
+        await db.commit()
+    
+    if alert_generated:
+        # The user's risk posture changed; drop the cached /getUserRisk response
+        await invalidate_user_risk(activity.user_id)
         print(f"[ALERT] User {activity.user_id} generated {alert_level} alert (score: {risk_score})")
     
     return ActivityLogResponse(
-        status="processed",
+        status="queued" if batcher is not None else "processed",
         risk_score=risk_score,
         alert_generated=alert_generated
     )
@@ -161,6 +316,20 @@ def log_activity(
 # API 2: GET /getAlerts
 # =============================================================================
 
+def _parse_alert_cursor(cursor: str) -> Tuple[datetime, Optional[int]]:
+    """
+    Split an X-Next-Cursor value into (generated_at, alert_id).
+    
+    A bare timestamp is also accepted and pages strictly before that time.
+    Offset-aware timestamps are compared as naive UTC.
+    """
+    timestamp, _, alert_id = cursor.partition("|")
+    try:
+        return to_naive_utc(datetime.fromisoformat(timestamp)), int(alert_id) if alert_id else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @app.get(
     "/getAlerts",
     response_model=List[AlertResponse],
@@ -169,72 +338,89 @@ def log_activity(
     description="""
     Retrieves security alerts matching the specified filters.
     
-    All parameters are optional. If no filters are provided, returns all alerts
-    ordered by generation time (newest first).
+    All parameters are optional. If no filters are provided, returns the most
+    recent alerts ordered by generation time (newest first).
     
     Supports filtering by:
     - user_id: Specific user
     - alert_level: LOW, MEDIUM, or HIGH
     - from_time: Alerts generated after this time
     - to_time: Alerts generated before this time
+    - limit: Maximum number of alerts returned (default 50, max 500)
+    - cursor: Continue after the last alert of the previous page (keyset pagination)
+    
+    When a full page is returned, the X-Next-Cursor response header holds the
+    cursor for the next page.
     """
 )
-def get_alerts(
-    user_id: Optional[str] = Query(None, description="Filter by user ID"),
-    alert_level: Optional[str] = Query(None, description="Filter by alert level (LOW, MEDIUM, HIGH)"),
-    from_time: Optional[datetime] = Query(None, description="Filter alerts from this time"),
-    to_time: Optional[datetime] = Query(None, description="Filter alerts until this time"),
-    db: Session = Depends(get_db)
-) -> List[AlertResponse]:
+async def get_alerts(
+    filters: Annotated[AlertFilter, Query()],
+    db: AsyncSession = Depends(get_scoped_db)
+) -> Response:
     """
     Query alerts with optional filters.
     
     Args:
-        user_id: Optional user ID filter
-        alert_level: Optional alert level filter
-        from_time: Optional start time filter
-        to_time: Optional end time filter
+        filters: Filter and pagination parameters (user_id, alert_level,
+                 from_time, to_time, limit, cursor)
         db: Database session
         
     Returns:
-        List of matching AlertResponse objects
+        JSON list of matching alerts
     """
-    # Build query filters
-    query = db.query(Alert)
+    # Build query filters over plain columns (Core rows, no ORM hydration)
+    query = select(
+        Alert.alert_id,
+        Alert.user_id,
+        Alert.risk_score,
+        Alert.alert_level,
+        Alert.reasons,
+        Alert.generated_at
+    )
     
-    if user_id:
-        query = query.filter(Alert.user_id == user_id)
+    if filters.user_id:
+        query = query.where(Alert.user_id == filters.user_id)
     
-    if alert_level:
+    if filters.alert_level:
         # Validate alert level
-        if alert_level.upper() not in ["LOW", "MEDIUM", "HIGH"]:
+        alert_level = filters.alert_level.upper()
+        if alert_level not in _VALID_ALERT_LEVELS:
             raise HTTPException(
                 status_code=400,
                 detail="Invalid alert_level. Must be LOW, MEDIUM, or HIGH"
             )
-        query = query.filter(Alert.alert_level == alert_level.upper())
-    
-    if from_time:
-        query = query.filter(Alert.generated_at >= from_time)
-    
-    if to_time:
-        query = query.filter(Alert.generated_at <= to_time)
-    
-    # Order by generated_at DESC (newest first)
-    alerts = query.order_by(desc(Alert.generated_at)).all()
-    
-    # Convert to response schema
-    return [
-        AlertResponse(
-            alert_id=alert.alert_id,
-            user_id=alert.user_id,
-            risk_score=float(alert.risk_score),
-            alert_level=alert.alert_level,
-            reasons=alert.reasons,
-            generated_at=alert.generated_at
-        )
-        for alert in alerts
-    ]
+        query = query.where(Alert.alert_level == alert_level)
+    
+    if filters.from_time:
+        query = query.where(Alert.generated_at >= filters.from_time)
+    
+    if filters.to_time:
+        query = query.where(Alert.generated_at <= filters.to_time)
+    
+    if filters.cursor:
+        cursor_time, cursor_id = _parse_alert_cursor(filters.cursor)
+        if cursor_id is None:
+            query = query.where(Alert.generated_at < cursor_time)
+        else:
+            query = query.where(tuple_(Alert.generated_at, Alert.alert_id) < tuple_(cursor_time, cursor_id))
+    
+    # Newest first; alert_id breaks ties between alerts from the same instant
+    result = await db.execute(
+        query.order_by(desc(Alert.generated_at), desc(Alert.alert_id)).limit(filters.limit)
+    )
+    rows = result.mappings().all()
+    
+    # A full page may have more alerts behind it; hand out the keyset cursor
+    headers = {}
+    if len(rows) == filters.limit:
+        last = rows[-1]
+        headers["X-Next-Cursor"] = f"{last['generated_at'].isoformat()}|{last['alert_id']}"
+    
+    return Response(
+        content=_ALERT_LIST_ADAPTER.dump_json(_ALERT_LIST_ADAPTER.validate_python(rows)),
+        media_type="application/json",
+        headers=headers
+    )
 
 
 # =============================================================================
@@ -258,9 +444,9 @@ def get_alerts(
     This endpoint is useful for SOC dashboards and security monitoring.
     """
 )
-def get_user_risk(
+async def get_user_risk(
     user_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_scoped_db)
 ) -> UserRiskResponse:
     """
     Get current risk posture for a user.
@@ -272,42 +458,68 @@ def get_user_risk(
     Returns:
         UserRiskResponse with user's current risk posture
     """
-    # Fetch user and role
-    user = db.query(User).filter(User.user_id == user_id).first()
+    # Serve from the response cache when available
+    cached = await get_cached_user_risk(user_id)
+    if cached is not None:
+        return cached
+    
+    # The user row carries its latest alert (kept current by create_alert),
+    # so this is a primary key lookup joined to the role name
+    result = await db.execute(
+        select(
+            User.current_risk_score,
+            User.risk_level,
+            User.last_alert_time,
+            Role.role_name
+        ).outerjoin(
+            Role, Role.role_id == User.role_id
+        ).where(
+            User.user_id == user_id
+        )
+    )
+    row = result.first()
     
-    if not user:
+    if not row:
         raise HTTPException(
             status_code=404,
             detail=f"User '{user_id}' not found"
         )
     
-    # Get user's role name
-    role = db.query(Role).filter(Role.role_id == user.role_id).first()
-    role_name = role.role_name if role else "unknown"
-    
-    # Get most recent alert
-    latest_alert = db.query(Alert).filter(
-        Alert.user_id == user_id
-    ).order_by(desc(Alert.generated_at)).first()
-    
-    # Determine current risk score and level
-    if latest_alert:
-        current_risk_score = float(latest_alert.risk_score)
-        risk_level = latest_alert.alert_level
-        last_alert_time = latest_alert.generated_at
-    else:
-        # No alerts - user is considered low risk
-        current_risk_score = 0.0
-        risk_level = "LOW"
-        last_alert_time = None
-    
-    return UserRiskResponse(
+    # Users without alerts keep the column defaults (score 0, LOW)
+    response = UserRiskResponse(
         user_id=user_id,
-        role=role_name,
-        current_risk_score=current_risk_score,
-        risk_level=risk_level,
-        last_alert_time=last_alert_time
+        role=row.role_name or "unknown",
+        current_risk_score=row.current_risk_score,
+        risk_level=row.risk_level,
+        last_alert_time=row.last_alert_time
     )
+    await cache_user_risk(response)
+    
+    return response
+
+
+# =============================================================================
+# Administration
+# =============================================================================
+
+@app.post(
+    "/refreshPolicies",
+    tags=["Administration"],
+    summary="Reload role policies and baselines",
+    description="""
+    Reloads the in-memory role policy set and role baselines used for risk
+    checks. Call this after changing the role_policies or role_baselines table.
+    """
+)
+async def refresh_policies(db: AsyncSession = Depends(get_scoped_db)):
+    """Reload role policies and baselines from the database."""
+    policies_loaded = await load_policies(db)
+    baselines_loaded = await load_role_baselines(db)
+    return {
+        "status": "refreshed",
+        "policies_loaded": policies_loaded,
+        "baselines_loaded": baselines_loaded
+    }
 
 
 # =============================================================================
@@ -320,7 +532,7 @@ def get_user_risk(
     summary="Health check",
     description="Returns API health status"
 )
-def health_check():
+async def health_check():
     """Simple health check endpoint."""
     return {
         "status": "healthy",
@@ -11,6 +11,7 @@ from backend.models.user import User
 from backend.models.activity_log import ActivityLog
 from backend.models.role_baseline import RoleBaseline
 from backend.models.alert import Alert
+from backend.models.user_daily_access import UserDailyAccess
 
-__all__ = ["Base", "Role", "RolePolicy", "User", "ActivityLog", "RoleBaseline", "Alert"]
+__all__ = ["Base", "Role", "RolePolicy", "User", "ActivityLog", "RoleBaseline", "Alert", "UserDailyAccess"]
 
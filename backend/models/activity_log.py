@@ -3,7 +3,7 @@ SECaaS Insider Threat Detection - Activity Log Model
 
 Records user activities for behavioral analysis and threat detection.
 """
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from backend.database import Base
 
@@ -30,12 +30,17 @@ class ActivityLog(Base):
     action = Column(String(10), nullable=False)  # READ, WRITE, UPDATE, DELETE
     resource = Column(String(100), nullable=False)
     records_accessed = Column(Integer, nullable=False, default=0)
-    access_time = Column(DateTime, nullable=False)
+    access_time = Column(DateTime, nullable=False, server_default=func.now())
     source_ip = Column(String(45))
     
     # Relationships
     user = relationship("User", back_populates="activity_logs")
     
+    # Per-user time range index used by the daily access frequency check
+    __table_args__ = (
+        Index("ix_activity_logs_user_time", user_id, access_time),
+    )
+    
     def __repr__(self):
         return f"<ActivityLog(log_id={self.log_id}, user_id='{self.user_id}', action='{self.action}')>"
 
@@ -3,7 +3,7 @@ SECaaS Insider Threat Detection - Alert Model
 
 Stores generated security alerts with risk scores and explanations.
 """
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, Text, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from backend.database import Base
 
@@ -26,14 +26,22 @@ class Alert(Base):
     
     alert_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(String(50), ForeignKey("users.user_id"), nullable=False)
-    risk_score = Column(Numeric(5, 2), nullable=False)
+    risk_score = Column(SmallInteger, nullable=False)  # Integer score 0-100
     alert_level = Column(String(10), nullable=False)
     reasons = Column(Text, nullable=False)
-    generated_at = Column(DateTime, nullable=False)
+    generated_at = Column(DateTime, nullable=False, server_default=func.now())  # Set by the database on INSERT
     
     # Relationships
     user = relationship("User", back_populates="alerts")
     
+    # Indexes matching the /getAlerts filters, ordered by generated_at DESC,
+    # plus the (generated_at, alert_id) keyset order of unfiltered pages
+    __table_args__ = (
+        Index("ix_alerts_user_generated", user_id, generated_at.desc()),
+        Index("ix_alerts_level_generated", alert_level, generated_at.desc()),
+        Index("ix_alerts_generated_id", generated_at.desc(), alert_id.desc()),
+    )
+    
     def __repr__(self):
         return f"<Alert(alert_id={self.alert_id}, user_id='{self.user_id}', level='{self.alert_level}')>"
 
@@ -5,6 +5,7 @@ Represents user roles in the system.
 Each role defines a set of permissions and behavioral baselines.
 """
 from sqlalchemy import Column, Integer, String, Text
+from sqlalchemy.orm import relationship
 from backend.database import Base
 
 class Role(Base):
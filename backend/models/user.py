@@ -3,7 +3,7 @@ SECaaS Insider Threat Detection - User Model
 
 Represents users in the system, linked to roles.
 """
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from backend.database import Base
 
@@ -15,6 +15,9 @@ class User(Base):
         user_id: Unique identifier (e.g., 'staff001')
         role_id: Foreign key to roles table
         status: User status (active/inactive)
+        current_risk_score: Risk score of the user's latest alert (0 if none)
+        risk_level: Alert level of the user's latest alert (LOW if none)
+        last_alert_time: When the user's latest alert was generated
     
     Relationships:
         role: Linked Role object
@@ -27,6 +30,11 @@ class User(Base):
     role_id = Column(Integer, ForeignKey("roles.role_id"), nullable=False)
     status = Column(String(20), nullable=False, default="active")
     
+    # Latest alert, denormalized by create_alert so /getUserRisk is a PK lookup
+    current_risk_score = Column(SmallInteger, nullable=False, default=0, server_default="0")
+    risk_level = Column(String(10), nullable=False, default="LOW", server_default="LOW")
+    last_alert_time = Column(DateTime)
+    
     # Relationships
     role = relationship("Role", back_populates="users")
     activity_logs = relationship("ActivityLog", back_populates="user")
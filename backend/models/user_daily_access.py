@@ -0,0 +1,28 @@
+"""
+SECaaS Insider Threat Detection - User Daily Access Model
+
+Per-user, per-day activity counters maintained at ingestion time.
+"""
+from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from backend.database import Base
+
+class UserDailyAccess(Base):
+    """
+    Rollup of activity log counts per user and calendar day.
+    
+    Incremented with an UPSERT whenever an activity log is written, so the
+    access frequency check reads one row instead of counting activity_logs.
+    
+    Attributes:
+        user_id: Foreign key to users table
+        day: Calendar day of the activities (from access_time)
+        access_count: Number of activities logged for the user on that day
+    """
+    __tablename__ = "user_daily_access"
+    
+    user_id = Column(String(50), ForeignKey("users.user_id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    access_count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<UserDailyAccess(user_id='{self.user_id}', day={self.day}, access_count={self.access_count})>"
@@ -15,6 +15,7 @@ from backend.schemas.alert import (
 from backend.schemas.user import (
     UserRiskResponse
 )
+from backend.schemas.common import to_naive_utc
 
 __all__ = [
     "ActivityLogRequest",
@@ -22,6 +23,7 @@ __all__ = [
     "ActivityLogCreate",
     "AlertResponse",
     "AlertFilter",
-    "UserRiskResponse"
+    "UserRiskResponse",
+    "to_naive_utc"
 ]
 
@@ -4,7 +4,9 @@ SECaaS Insider Threat Detection - Activity Log Schemas
 Pydantic schemas for activity logging API.
 """
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from backend.schemas.common import to_naive_utc
 
 class ActivityLogRequest(BaseModel):
     """
@@ -15,7 +17,8 @@ class ActivityLogRequest(BaseModel):
         action: Type of action (READ, WRITE, UPDATE, DELETE)
         resource: Resource being accessed
         records_accessed: Number of records accessed
-        access_time: Timestamp of the activity
+        access_time: Timestamp of the activity (offsets are converted to
+            naive UTC to match the TIMESTAMP columns)
         source_ip: IP address of the source
     """
     user_id: str = Field(..., example="staff001", description="User identifier")
@@ -24,6 +27,12 @@ class ActivityLogRequest(BaseModel):
     records_accessed: int = Field(default=0, ge=0, example=5200, description="Number of records accessed")
     access_time: datetime = Field(..., example="2026-02-02T22:14:00", description="Timestamp of activity")
     source_ip: str = Field(default=None, example="10.10.1.5", description="Source IP address")
+    
+    @field_validator("access_time")
+    @classmethod
+    def normalize_access_time(cls, value: datetime) -> datetime:
+        """Store offset-aware timestamps (e.g. "...Z") as naive UTC."""
+        return to_naive_utc(value)
 
 class ActivityLogResponse(BaseModel):
     """
@@ -4,7 +4,9 @@ SECaaS Insider Threat Detection - Alert Schemas
 Pydantic schemas for alert-related API endpoints.
 """
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from backend.schemas.common import to_naive_utc
 
 class AlertResponse(BaseModel):
     """
@@ -18,6 +20,9 @@ class AlertResponse(BaseModel):
         reasons: Human-readable explanation
         generated_at: Timestamp when alert was generated
     """
+    # Allow building responses straight from Alert ORM objects
+    model_config = ConfigDict(from_attributes=True)
+    
     alert_id: int = Field(..., example=12, description="Alert identifier")
     user_id: str = Field(..., example="staff001", description="User who triggered the alert")
     risk_score: float = Field(..., example=90.0, description="Calculated risk score")
@@ -27,11 +32,19 @@ class AlertResponse(BaseModel):
 
 class AlertFilter(BaseModel):
     """
-    Filter parameters for GET /getAlerts endpoint.
-    All parameters are optional.
+    Filter and pagination parameters for GET /getAlerts endpoint.
+    All parameters are optional; results are always bounded by limit.
     """
     user_id: str | None = Field(None, example="staff001", description="Filter by user ID")
     alert_level: str | None = Field(None, example="HIGH", description="Filter by alert level (LOW, MEDIUM, HIGH)")
     from_time: datetime | None = Field(None, example="2026-02-01T00:00:00", description="Filter alerts from this time")
     to_time: datetime | None = Field(None, example="2026-02-03T00:00:00", description="Filter alerts until this time")
+    limit: int = Field(50, ge=1, le=500, description="Maximum number of alerts to return")
+    cursor: str | None = Field(None, example="2026-02-02T22:14:02|12", description="Keyset cursor from X-Next-Cursor; returns alerts after it (newest first)")
+    
+    @field_validator("from_time", "to_time")
+    @classmethod
+    def normalize_times(cls, value: datetime | None) -> datetime | None:
+        """Compare offset-aware bounds (e.g. "...Z") as naive UTC."""
+        return to_naive_utc(value) if value is not None else None
 
@@ -0,0 +1,17 @@
+"""
+SECaaS Insider Threat Detection - Shared Schema Helpers
+
+Helpers used by more than one schema module.
+"""
+from datetime import datetime, timezone
+
+def to_naive_utc(value: datetime) -> datetime:
+    """
+    Convert an offset-aware timestamp (e.g. "...Z") to naive UTC.
+    
+    Timestamp columns are naive TIMESTAMP, and asyncpg cannot bind an
+    offset-aware datetime to them. Naive values are returned unchanged.
+    """
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
@@ -0,0 +1,117 @@
+"""
+SECaaS Insider Threat Detection - Activity Log Batcher
+
+Background writer that coalesces activity log rows from many requests
+into multi-row INSERTs, amortizing commit/WAL cost across the batch.
+"""
+import asyncio
+from typing import Any, Dict, List, Optional
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.models import ActivityLog
+from backend.services.risk_detector import daily_access_upsert
+
+# Queue marker telling the writer task to flush what it has and exit
+_STOP = object()
+
+class ActivityLogBatcher:
+    """
+    Queue-backed activity log writer.
+    
+    Rows are enqueued by /logActivity and written by a background task in
+    batches of up to batch_size rows, or whatever has arrived once
+    flush_interval seconds have passed since the first queued row.
+    
+    Attributes:
+        batch_size: Maximum rows per INSERT
+        flush_interval: Maximum seconds a row waits before being written
+    """
+    
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        batch_size: int = 500,
+        flush_interval: float = 0.1
+    ):
+        """Initialize the batcher; call start() to launch the writer task."""
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._session_factory = session_factory
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Launch the background writer task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Flush all queued rows and stop the writer task."""
+        if self._task is not None:
+            self._queue.put_nowait(_STOP)
+            await self._task
+            self._task = None
+    
+    def enqueue(self, row: Dict[str, Any]) -> None:
+        """
+        Queue an activity log row for the next batch.
+        
+        Args:
+            row: Column values for one ActivityLog row
+        """
+        self._queue.put_nowait(row)
+    
+    async def _run(self) -> None:
+        """Collect queued rows into batches and write them until stopped."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        
+        while not stopping:
+            row = await self._queue.get()
+            if row is _STOP:
+                break
+            
+            rows = [row]
+            deadline = loop.time() + self.flush_interval
+            while len(rows) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                rows.append(row)
+            
+            await self._flush(rows)
+    
+    async def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Write one batch, falling back to one transaction per row on failure.
+        
+        A single bad row (or a transient error) fails the whole multi-row
+        INSERT; retrying row by row means only rows that fail on their own
+        are dropped.
+        """
+        try:
+            await self._write(rows)
+            return
+        except Exception as e:
+            print(f"[BATCH] Failed to write {len(rows)} activity logs, retrying row by row: {e}")
+        
+        for row in rows:
+            try:
+                await self._write([row])
+            except Exception as e:
+                print(f"[BATCH] Dropped activity log for user {row['user_id']}: {e}")
+    
+    async def _write(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert rows with a single multi-row INSERT and commit."""
+        async with self._session_factory() as db:
+            await db.execute(insert(ActivityLog), rows)
+            await db.execute(daily_access_upsert(rows))
+            await db.commit()
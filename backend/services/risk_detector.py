@@ -4,13 +4,183 @@ SECaaS Insider Threat Detection - Risk Detection Service
 Core detection logic for insider threat identification.
 Implements role-based behavior profiling and risk scoring.
 """
-from typing import Optional, Tuple, List
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-from datetime import datetime, timedelta
+import bisect
+import time
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Optional, Tuple, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import bindparam, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import datetime
+
+from backend.config import (
+    RISK_SCORE_THRESHOLD,
+    RISK_WEIGHTS,
+    ALERT_LEVELS,
+    POLICY_CACHE_TTL,
+    BASELINE_CACHE_TTL
+)
+from backend.models import Role, RolePolicy, User, ActivityLog, RoleBaseline, Alert, UserDailyAccess
+
+
+# ALERT_LEVELS sorted by the lower bound of each score band
+_ALERT_BANDS = sorted(ALERT_LEVELS.items(), key=lambda item: item[1][0])
+_ALERT_THRESHOLDS = [low for _, (low, _high) in _ALERT_BANDS]
+_ALERT_LEVEL_NAMES = [level for level, _ in _ALERT_BANDS]
+
+
+def _resolve_alert_level(risk_score: int) -> str:
+    """Map a score to the highest alert level whose band starts at or below it."""
+    return _ALERT_LEVEL_NAMES[max(bisect.bisect_right(_ALERT_THRESHOLDS, risk_score) - 1, 0)]
+
+
+# Alert level for every possible score (0-100), resolved once at import so
+# get_alert_level is a single tuple index on the ingestion path
+_ALERT_LEVEL_TABLE = tuple(_resolve_alert_level(score) for score in range(101))
+
+# Sole reason given for an unknown user_id; such activities cannot be
+# stored (activity_logs.user_id references users)
+USER_NOT_FOUND_REASON = "User not found"
+
+# Rule tiers as (score, reason template) pairs, least to most severe, with
+# the RISK_WEIGHTS fractions folded in once at import. Checks index them by
+# the number of tier thresholds exceeded, minus one.
+_POLICY_VIOLATION_SCORE = RISK_WEIGHTS["policy_violation"]
+_POLICY_VIOLATION_REASON = "Unauthorized {} access to {}"
+
+# Records accessed vs. baseline average: > 2x, > 5x, > 10x
+_RECORDS_TIERS = (
+    (int(RISK_WEIGHTS["excessive_records"] * 0.5), "Elevated records access ({} vs baseline {})"),
+    (int(RISK_WEIGHTS["excessive_records"] * 0.8), "Excessive records access ({} vs baseline {})"),
+    (RISK_WEIGHTS["excessive_records"], "Extreme records access ({} vs baseline {})")
+)
+
+# Hours outside the normal window: 1-2, 2-4, 4+
+_OFF_HOUR_TIERS = (
+    (int(RISK_WEIGHTS["off_hour_access"] * 0.5), "Early/late access at {}"),
+    (int(RISK_WEIGHTS["off_hour_access"] * 0.7), "Off-hour access at {}"),
+    (RISK_WEIGHTS["off_hour_access"], "Severe off-hour access at {}")
+)
+
+# Accesses today vs. baseline daily average: > 1.5x, > 2x, > 3x
+_FREQUENCY_TIERS = (
+    (int(RISK_WEIGHTS["high_frequency"] * 0.5), "Increased access frequency ({} today)"),
+    (int(RISK_WEIGHTS["high_frequency"] * 0.7), "Elevated access frequency ({} today)"),
+    (RISK_WEIGHTS["high_frequency"], "Extremely high access frequency ({} today)")
+)
+
+# Allowed (role_id, action, resource) tuples. Loaded at startup or on first
+# use so policy checks are a set membership test, not a query. The set is
+# reloaded after POLICY_CACHE_TTL seconds so every API worker process picks
+# up policy changes, not just the one that served /refreshPolicies.
+_policy_set: Optional[FrozenSet[Tuple[int, str, str]]] = None
+_policy_expires_at = 0.0
+
+
+class RoleBaselineProfile(NamedTuple):
+    """Immutable copy of a role_baselines row, safe to share across sessions."""
+    avg_records_per_access: float
+    avg_access_per_day: int
+    normal_start_hour: int
+    normal_end_hour: int
+
+
+# Role baselines by role_id, held in process like the policy set: a handful
+# of rows that only change through admin edits, reloaded after
+# BASELINE_CACHE_TTL seconds
+_role_baselines: Optional[Dict[int, RoleBaselineProfile]] = None
+_baselines_expires_at = 0.0
+
+# Hot-path statements, built once at import. Per-call values are passed as
+# bound parameters, so each request skips rebuilding the expression tree and
+# hits the engine's compiled cache with the same statement object.
+_Q_POLICIES = select(RolePolicy.role_id, RolePolicy.action, RolePolicy.resource)
+
+_Q_ROLE_BASELINES = select(
+    RoleBaseline.role_id,
+    RoleBaseline.avg_records_per_access,
+    RoleBaseline.avg_access_per_day,
+    RoleBaseline.normal_start_hour,
+    RoleBaseline.normal_end_hour
+)
+
+_Q_USER_PROFILE = (
+    select(User, Role)
+    .outerjoin(Role, Role.role_id == User.role_id)
+    .where(User.user_id == bindparam("user_id"))
+)
+
+_Q_DAILY_ACCESS_COUNT = (
+    select(UserDailyAccess.access_count)
+    .where(
+        UserDailyAccess.user_id == bindparam("user_id"),
+        UserDailyAccess.day == bindparam("day")
+    )
+)
+
+
+async def load_policies(db: AsyncSession) -> int:
+    """
+    (Re)load all role policies into the in-process policy set.
+    
+    Args:
+        db: Async database session
+        
+    Returns:
+        Number of policies loaded
+    """
+    global _policy_set, _policy_expires_at
+    result = await db.execute(_Q_POLICIES)
+    _policy_set = frozenset(tuple(row) for row in result)
+    _policy_expires_at = time.monotonic() + POLICY_CACHE_TTL
+    return len(_policy_set)
+
+
+async def load_role_baselines(db: AsyncSession) -> int:
+    """
+    (Re)load all role baselines into the in-process baseline map.
+    
+    Args:
+        db: Async database session
+        
+    Returns:
+        Number of baselines loaded
+    """
+    global _role_baselines, _baselines_expires_at
+    result = await db.execute(_Q_ROLE_BASELINES)
+    _role_baselines = {
+        row.role_id: RoleBaselineProfile(
+            float(row.avg_records_per_access),
+            row.avg_access_per_day,
+            row.normal_start_hour,
+            row.normal_end_hour
+        )
+        for row in result
+    }
+    _baselines_expires_at = time.monotonic() + BASELINE_CACHE_TTL
+    return len(_role_baselines)
+
+
+def daily_access_upsert(rows: Iterable[Dict]):
+    """
+    Build an UPSERT adding the given activity log rows to user_daily_access.
+    
+    Args:
+        rows: Activity log column dicts (user_id, access_time, ...)
+        
+    Returns:
+        INSERT ... ON CONFLICT (user_id, day) DO UPDATE statement
+    """
+    counts = Counter((row["user_id"], row["access_time"].date()) for row in rows)
+    stmt = pg_insert(UserDailyAccess).values([
+        {"user_id": user_id, "day": day, "access_count": count}
+        for (user_id, day), count in counts.items()
+    ])
+    return stmt.on_conflict_do_update(
+        index_elements=[UserDailyAccess.user_id, UserDailyAccess.day],
+        set_={"access_count": UserDailyAccess.access_count + stmt.excluded.access_count}
+    )
 
-from backend.config import RISK_SCORE_THRESHOLD, RISK_WEIGHTS, ALERT_LEVELS
-from backend.models import Role, User, ActivityLog, RoleBaseline, Alert
 
 class RiskDetector:
     """
@@ -24,31 +194,53 @@ class RiskDetector:
     5. Aggregating risk scores
     
     Attributes:
-        db: Database session
+        db: Async database session
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         """Initialize risk detector with database session."""
         self.db = db
     
-    def get_user_and_role(self, user_id: str) -> Tuple[Optional[User], Optional[Role]]:
+    async def get_user_profile(
+        self,
+        user_id: str
+    ) -> Tuple[Optional[User], Optional[Role], Optional[RoleBaselineProfile]]:
         """
-        Fetch user and their associated role.
+        Fetch a user together with their role and the role's baseline.
+        
+        Role is outer-joined onto the user row in one round-trip; the
+        baseline comes from the in-process baseline map.
         
         Args:
             user_id: User identifier
             
         Returns:
-            Tuple of (User, Role) or (None, None) if not found
+            Tuple of (User, Role, RoleBaselineProfile) or (None, None, None)
+            if the user is not found; Role/baseline are None if not defined
         """
-        user = self.db.query(User).filter(User.user_id == user_id).first()
-        if not user:
-            return None, None
+        result = await self.db.execute(_Q_USER_PROFILE, {"user_id": user_id})
+        row = result.first()
+        if row is None:
+            return None, None, None
         
-        role = self.db.query(Role).filter(Role.role_id == user.role_id).first()
-        return user, role
+        return row.User, row.Role, await self.get_role_baseline(row.User.role_id)
     
-    def check_policy_violation(self, role_id: int, action: str, resource: str) -> Tuple[bool, str]:
+    async def get_role_baseline(self, role_id: int) -> Optional[RoleBaselineProfile]:
+        """
+        Look up a role's baseline, reloading the baseline map once it expires.
+        
+        Args:
+            role_id: Role identifier
+            
+        Returns:
+            RoleBaselineProfile or None if the role has no baseline
+        """
+        if _role_baselines is None or time.monotonic() >= _baselines_expires_at:
+            await load_role_baselines(self.db)
+        
+        return _role_baselines.get(role_id)
+    
+    async def check_policy_violation(self, role_id: int, action: str, resource: str) -> Tuple[bool, str]:
         """
         Check if the (action, resource) combination is allowed for the role.
         
@@ -60,25 +252,18 @@ class RiskDetector:
         Returns:
             Tuple of (is_violation: bool, reason: str)
         """
-        from backend.models import RolePolicy
-        
-        # Check if policy exists for this role, action, and resource
-        policy = self.db.query(RolePolicy).filter(
-            and_(
-                RolePolicy.role_id == role_id,
-                RolePolicy.action == action,
-                RolePolicy.resource == resource
-            )
-        ).first()
+        if _policy_set is None or time.monotonic() >= _policy_expires_at:
+            await load_policies(self.db)
         
-        if policy:
+        # Check for an exact policy or a wildcard ("*") resource grant
+        if (role_id, action, resource) in _policy_set or (role_id, action, "*") in _policy_set:
             return False, ""
         
-        return True, f"Unauthorized {action} access to {resource}"
+        return True, _POLICY_VIOLATION_REASON.format(action, resource)
     
     def check_excessive_records(
         self, 
-        role_baseline: Optional[RoleBaseline], 
+        role_baseline: Optional[RoleBaselineProfile], 
         records_accessed: int
     ) -> Tuple[int, str]:
         """
@@ -95,25 +280,22 @@ class RiskDetector:
             # No baseline defined - assume moderate risk
             return 0, ""
         
-        baseline_avg = float(role_baseline.avg_records_per_access)
+        baseline_avg = role_baseline.avg_records_per_access
         
         # Calculate how many standard deviations above baseline
         # Using a simple multiplier approach for explainability
         if baseline_avg > 0:
             ratio = records_accessed / baseline_avg
-            
-            if ratio > 10:
-                return RISK_WEIGHTS["excessive_records"], f"Extreme records access ({records_accessed} vs baseline {baseline_avg})"
-            elif ratio > 5:
-                return int(RISK_WEIGHTS["excessive_records"] * 0.8), f"Excessive records access ({records_accessed} vs baseline {baseline_avg})"
-            elif ratio > 2:
-                return int(RISK_WEIGHTS["excessive_records"] * 0.5), f"Elevated records access ({records_accessed} vs baseline {baseline_avg})"
+            tier = (ratio > 2) + (ratio > 5) + (ratio > 10)
+            if tier:
+                score, reason = _RECORDS_TIERS[tier - 1]
+                return score, reason.format(records_accessed, baseline_avg)
         
         return 0, ""
     
     def check_off_hour_access(
         self, 
-        role_baseline: Optional[RoleBaseline], 
+        role_baseline: Optional[RoleBaselineProfile], 
         access_time: datetime
     ) -> Tuple[int, str]:
         """
@@ -131,27 +313,21 @@ class RiskDetector:
         
         hour = access_time.hour
         
-        # Check if outside normal hours
-        if hour < role_baseline.normal_start_hour or hour > role_baseline.normal_end_hour:
-            # Calculate how far outside normal hours
-            if hour < role_baseline.normal_start_hour:
-                hours_outside = role_baseline.normal_start_hour - hour
-            else:
-                hours_outside = hour - role_baseline.normal_end_hour
-            
-            if hours_outside >= 4:
-                return RISK_WEIGHTS["off_hour_access"], f"Severe off-hour access at {access_time.strftime('%H:%M')}"
-            elif hours_outside >= 2:
-                return int(RISK_WEIGHTS["off_hour_access"] * 0.7), f"Off-hour access at {access_time.strftime('%H:%M')}"
-            else:
-                return int(RISK_WEIGHTS["off_hour_access"] * 0.5), f"Early/late access at {access_time.strftime('%H:%M')}"
+        # Hours before the start of the window, else hours past its end
+        hours_outside = (
+            max(role_baseline.normal_start_hour - hour, 0)
+            or max(hour - role_baseline.normal_end_hour, 0)
+        )
+        if not hours_outside:
+            return 0, ""
         
-        return 0, ""
+        score, reason = _OFF_HOUR_TIERS[(hours_outside >= 2) + (hours_outside >= 4)]
+        return score, reason.format(f"{hour:02d}:{access_time.minute:02d}")
     
-    def check_access_frequency(
+    async def check_access_frequency(
         self, 
         user_id: str, 
-        role_baseline: Optional[RoleBaseline], 
+        role_baseline: Optional[RoleBaselineProfile], 
         access_time: datetime
     ) -> Tuple[int, str]:
         """
@@ -168,33 +344,24 @@ class RiskDetector:
         if not role_baseline:
             return 0, ""
         
-        # Count accesses in the current day
-        day_start = access_time.replace(hour=0, minute=0, second=0, microsecond=0)
-        day_end = day_start + timedelta(days=1)
-        
-        access_count = self.db.query(ActivityLog).filter(
-            and_(
-                ActivityLog.user_id == user_id,
-                ActivityLog.access_time >= day_start,
-                ActivityLog.access_time < day_end
-            )
-        ).count()
+        # Read the user's access count for the day from the daily rollup
+        access_count = await self.db.scalar(
+            _Q_DAILY_ACCESS_COUNT,
+            {"user_id": user_id, "day": access_time.date()}
+        ) or 0
         
         baseline_avg = role_baseline.avg_access_per_day
         
         if baseline_avg > 0:
             ratio = access_count / baseline_avg
-            
-            if ratio > 3:
-                return RISK_WEIGHTS["high_frequency"], f"Extremely high access frequency ({access_count} today)"
-            elif ratio > 2:
-                return int(RISK_WEIGHTS["high_frequency"] * 0.7), f"Elevated access frequency ({access_count} today)"
-            elif ratio > 1.5:
-                return int(RISK_WEIGHTS["high_frequency"] * 0.5), f"Increased access frequency ({access_count} today)"
+            tier = (ratio > 1.5) + (ratio > 2) + (ratio > 3)
+            if tier:
+                score, reason = _FREQUENCY_TIERS[tier - 1]
+                return score, reason.format(access_count)
         
         return 0, ""
     
-    def calculate_risk_score(
+    async def calculate_risk_score(
         self,
         user_id: str,
         action: str,
@@ -227,28 +394,23 @@ class RiskDetector:
         reasons = []
         total_score = 0
         
-        # Step 1: Validate user exists and is active
-        user, role = self.get_user_and_role(user_id)
+        # Step 1: Fetch user, role, and role baseline; validate user is active
+        user, role, role_baseline = await self.get_user_profile(user_id)
         if not user:
-            return 100, ["User not found"]
+            return 100, [USER_NOT_FOUND_REASON]
         
         if user.status != "active":
             return 100, [f"User account is {user.status}"]
         
-        # Step 2: Fetch role baseline
-        role_baseline = self.db.query(RoleBaseline).filter(
-            RoleBaseline.role_id == user.role_id
-        ).first()
-        
-        # Step 3: Check policy violation
-        is_violation, violation_reason = self.check_policy_violation(
+        # Step 2: Check policy violation
+        is_violation, violation_reason = await self.check_policy_violation(
             user.role_id, action, resource
         )
         if is_violation:
-            total_score += RISK_WEIGHTS["policy_violation"]
+            total_score += _POLICY_VIOLATION_SCORE
             reasons.append(violation_reason)
         
-        # Step 4: Check excessive records
+        # Step 3: Check excessive records
         records_score, records_reason = self.check_excessive_records(
             role_baseline, records_accessed
         )
@@ -256,7 +418,7 @@ class RiskDetector:
         if records_reason:
             reasons.append(records_reason)
         
-        # Step 5: Check off-hour access
+        # Step 4: Check off-hour access
         hour_score, hour_reason = self.check_off_hour_access(
             role_baseline, access_time
         )
@@ -264,8 +426,12 @@ class RiskDetector:
         if hour_reason:
             reasons.append(hour_reason)
         
-        # Step 6: Check access frequency
-        freq_score, freq_reason = self.check_access_frequency(
+        # Already capped: skip the frequency check and its database read
+        if total_score >= 100:
+            return 100, reasons
+        
+        # Step 5: Check access frequency
+        freq_score, freq_reason = await self.check_access_frequency(
             user_id, role_baseline, access_time
         )
         total_score += freq_score
@@ -287,12 +453,7 @@ class RiskDetector:
         Returns:
             Alert level string (LOW, MEDIUM, HIGH)
         """
-        for level, (low, high) in ALERT_LEVELS.items():
-            if low <= risk_score <= high:
-                return level
-        
-        # Default to HIGH for scores above 90
-        return "HIGH" if risk_score >= 90 else "MEDIUM"
+        return _ALERT_LEVEL_TABLE[min(max(int(risk_score), 0), 100)]
     
     def should_generate_alert(self, risk_score: int) -> bool:
         """
@@ -306,14 +467,15 @@ class RiskDetector:
         """
         return risk_score >= RISK_SCORE_THRESHOLD
     
-    def create_activity_log(
+    async def create_activity_log(
         self,
         user_id: str,
         action: str,
         resource: str,
         records_accessed: int,
         access_time: datetime,
-        source_ip: Optional[str]
+        source_ip: Optional[str],
+        commit: bool = True
     ) -> ActivityLog:
         """
         Create a new activity log entry.
@@ -325,31 +487,43 @@ class RiskDetector:
             records_accessed: Number of records accessed
             access_time: Timestamp of access
             source_ip: Source IP address
+            commit: Commit immediately; pass False to let the caller commit
+                    this entry together with other pending changes
             
         Returns:
             Created ActivityLog object
         """
-        activity_log = ActivityLog(
-            user_id=user_id,
-            action=action,
-            resource=resource,
-            records_accessed=records_accessed,
-            access_time=access_time,
-            source_ip=source_ip
+        values = {
+            "user_id": user_id,
+            "action": action,
+            "resource": resource,
+            "records_accessed": records_accessed,
+            "access_time": access_time,
+            "source_ip": source_ip
+        }
+        
+        # Core INSERT ... RETURNING: no ORM unit-of-work bookkeeping for a
+        # row the request never reads back
+        log_id = await self.db.scalar(
+            insert(ActivityLog).values(**values).returning(ActivityLog.log_id)
         )
         
-        self.db.add(activity_log)
-        self.db.commit()
-        self.db.refresh(activity_log)
+        # Count the activity in the user's daily rollup (same transaction)
+        await self.db.execute(daily_access_upsert([values]))
         
-        return activity_log
+        if commit:
+            await self.db.commit()
+        
+        # Transient (session-less) copy of the written row for callers
+        return ActivityLog(log_id=log_id, **values)
     
-    def create_alert(
+    async def create_alert(
         self,
         user_id: str,
         risk_score: int,
         alert_level: str,
-        reasons: List[str]
+        reasons: List[str],
+        commit: bool = True
     ) -> Alert:
         """
         Create a new alert entry.
@@ -359,30 +533,53 @@ class RiskDetector:
             risk_score: Calculated risk score
             alert_level: Alert severity level
             reasons: List of risk reasons
+            commit: Commit immediately; pass False to let the caller commit
+                    this alert together with other pending changes
             
         Returns:
             Created Alert object
         """
-        alert = Alert(
-            user_id=user_id,
-            risk_score=risk_score,
-            alert_level=alert_level,
-            reasons="; ".join(reasons)
+        values = {
+            "user_id": user_id,
+            "risk_score": risk_score,
+            "alert_level": alert_level,
+            "reasons": "; ".join(reasons)
+        }
+        
+        # Core INSERT ... RETURNING, fetching the server-generated columns
+        result = await self.db.execute(
+            insert(Alert).values(**values).returning(Alert.alert_id, Alert.generated_at)
+        )
+        alert_id, generated_at = result.one()
+        
+        # Record it as the user's latest alert (same transaction), unless a
+        # concurrent request already stored a newer one
+        await self.db.execute(
+            update(User)
+            .where(
+                User.user_id == user_id,
+                or_(User.last_alert_time.is_(None), User.last_alert_time <= generated_at)
+            )
+            .values(
+                current_risk_score=risk_score,
+                risk_level=alert_level,
+                last_alert_time=generated_at
+            )
         )
         
-        self.db.add(alert)
-        self.db.commit()
-        self.db.refresh(alert)
+        if commit:
+            await self.db.commit()
         
-        return alert
+        # Transient (session-less) copy of the written row for callers
+        return Alert(alert_id=alert_id, generated_at=generated_at, **values)
 
 
-def get_risk_detector(db: Session) -> RiskDetector:
+def get_risk_detector(db: AsyncSession) -> RiskDetector:
     """
     Factory function to get RiskDetector instance.
     
     Args:
-        db: Database session
+        db: Async database session
         
     Returns:
         RiskDetector instance
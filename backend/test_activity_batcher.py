@@ -0,0 +1,153 @@
+"""
+SECaaS Insider Threat Detection - Activity Log Batcher Tests
+
+Exercises ActivityLogBatcher against a fake session factory, so no
+database is needed: size- and interval-based flushing, draining on
+stop(), and recovery when a batch fails to write.
+
+Run with: python -m pytest -q backend/test_activity_batcher.py
+"""
+import asyncio
+from datetime import datetime
+
+from backend.services.activity_batcher import ActivityLogBatcher
+
+
+class _FakeSession:
+    """Stands in for AsyncSession: records committed activity log rows."""
+    
+    def __init__(self, factory):
+        self.factory = factory
+        self.rows = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    async def execute(self, statement, params=None):
+        if params is None:
+            return  # daily access upsert
+        if self.factory.transient_failures:
+            self.factory.transient_failures -= 1
+            raise ConnectionError("connection reset")
+        if any(row["user_id"] in self.factory.unknown_users for row in params):
+            raise ValueError("violates foreign key constraint")
+        self.rows = list(params)
+    
+    async def commit(self):
+        self.factory.batches.append(self.rows)
+
+
+class _FakeSessionFactory:
+    """Callable like async_sessionmaker; keeps every committed batch."""
+    
+    def __init__(self, unknown_users=(), transient_failures=0):
+        self.unknown_users = set(unknown_users)
+        self.transient_failures = transient_failures
+        self.batches = []
+    
+    def __call__(self):
+        return _FakeSession(self)
+    
+    @property
+    def written(self):
+        return [row["user_id"] for batch in self.batches for row in batch]
+
+
+def _row(user_id: str) -> dict:
+    return {
+        "user_id": user_id,
+        "action": "READ",
+        "resource": "General_Documents",
+        "records_accessed": 1,
+        "access_time": datetime(2026, 2, 2, 10, 0),
+        "source_ip": None
+    }
+
+
+def test_flushes_full_batches_by_size():
+    """A batch is written as soon as batch_size rows are queued."""
+    
+    async def run():
+        factory = _FakeSessionFactory()
+        batcher = ActivityLogBatcher(factory, batch_size=3, flush_interval=60)
+        batcher.start()
+        for i in range(7):
+            batcher.enqueue(_row(f"user{i}"))
+        await asyncio.sleep(0.05)
+        full_batches = [len(batch) for batch in factory.batches]
+        await batcher.stop()
+        return full_batches, factory
+    
+    full_batches, factory = asyncio.run(run())
+    assert full_batches == [3, 3]
+    assert [len(batch) for batch in factory.batches] == [3, 3, 1]
+    assert factory.written == [f"user{i}" for i in range(7)]
+
+
+def test_flushes_partial_batch_after_interval():
+    """Rows are written once flush_interval passes, without reaching batch_size."""
+    
+    async def run():
+        factory = _FakeSessionFactory()
+        batcher = ActivityLogBatcher(factory, batch_size=100, flush_interval=0.05)
+        batcher.start()
+        batcher.enqueue(_row("user0"))
+        batcher.enqueue(_row("user1"))
+        await asyncio.sleep(0.2)
+        batches = list(factory.batches)
+        await batcher.stop()
+        return batches
+    
+    batches = asyncio.run(run())
+    assert [len(batch) for batch in batches] == [2]
+
+
+def test_stop_drains_queue():
+    """stop() writes everything queued before it returns."""
+    
+    async def run():
+        factory = _FakeSessionFactory()
+        batcher = ActivityLogBatcher(factory, batch_size=100, flush_interval=60)
+        batcher.start()
+        for i in range(5):
+            batcher.enqueue(_row(f"user{i}"))
+        await batcher.stop()
+        return factory
+    
+    factory = asyncio.run(run())
+    assert factory.written == [f"user{i}" for i in range(5)]
+
+
+def test_failed_batch_only_drops_bad_rows():
+    """A row that fails the batch INSERT does not take the other rows with it."""
+    
+    async def run():
+        factory = _FakeSessionFactory(unknown_users={"ghost"})
+        batcher = ActivityLogBatcher(factory, batch_size=100, flush_interval=60)
+        batcher.start()
+        for user_id in ("user0", "ghost", "user1", "user2"):
+            batcher.enqueue(_row(user_id))
+        await batcher.stop()
+        return factory
+    
+    factory = asyncio.run(run())
+    assert factory.written == ["user0", "user1", "user2"]
+
+
+def test_transient_failure_keeps_batch():
+    """A batch that fails once is still written by the row-by-row retry."""
+    
+    async def run():
+        factory = _FakeSessionFactory(transient_failures=1)
+        batcher = ActivityLogBatcher(factory, batch_size=100, flush_interval=60)
+        batcher.start()
+        for i in range(3):
+            batcher.enqueue(_row(f"user{i}"))
+        await batcher.stop()
+        return factory
+    
+    factory = asyncio.run(run())
+    assert factory.written == ["user0", "user1", "user2"]
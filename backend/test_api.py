@@ -6,14 +6,25 @@ Run this after initializing the database and starting the API server.
 """
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 
 BASE_URL = "http://localhost:8000"
 
+# Sample data seeded by init_db.py
+SEEDED_POLICIES = 11
+SEEDED_BASELINES = 3
+
+# One keep-alive session for the whole suite, pooled for the parallel phases
+SESSION = requests.Session()
+SESSION.headers.update({"Content-Type": "application/json"})
+SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
 def test_health():
     """Test health endpoint."""
     print("Testing /health endpoint...")
-    response = requests.get(f"{BASE_URL}/health")
+    response = SESSION.get(f"{BASE_URL}/health")
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
@@ -32,11 +43,7 @@ def test_log_activity_high_risk():
         "source_ip": "10.10.1.5"
     }
     
-    response = requests.post(
-        f"{BASE_URL}/logActivity",
-        json=activity,
-        headers={"Content-Type": "application/json"}
-    )
+    response = SESSION.post(f"{BASE_URL}/logActivity", json=activity)
     
     assert response.status_code == 200
     data = response.json()
@@ -60,11 +67,7 @@ def test_log_activity_low_risk():
         "source_ip": "10.10.1.5"
     }
     
-    response = requests.post(
-        f"{BASE_URL}/logActivity",
-        json=activity,
-        headers={"Content-Type": "application/json"}
-    )
+    response = SESSION.post(f"{BASE_URL}/logActivity", json=activity)
     
     assert response.status_code == 200
     data = response.json()
@@ -75,10 +78,31 @@ def test_log_activity_low_risk():
     assert data["alert_generated"] == False
     print("✅ Low risk activity test passed!")
 
+def test_log_activity_utc_offset():
+    """Test logging an activity whose timestamp carries a UTC offset."""
+    print("\nTesting /logActivity with an offset-aware timestamp...")
+    
+    activity = {
+        "user_id": "staff001",
+        "action": "READ",
+        "resource": "General_Documents",
+        "records_accessed": 3,
+        "access_time": "2026-02-02T12:00:00+02:00",  # Stored as 10:00 UTC
+        "source_ip": "10.10.1.5"
+    }
+    
+    response = SESSION.post(f"{BASE_URL}/logActivity", json=activity)
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "processed"
+    assert data["risk_score"] < 70  # Within normal hours once converted
+    print("✅ UTC offset activity test passed!")
+
 def test_get_alerts():
     """Test getting alerts."""
     print("\nTesting /getAlerts endpoint...")
-    response = requests.get(f"{BASE_URL}/getAlerts")
+    response = SESSION.get(f"{BASE_URL}/getAlerts")
     
     assert response.status_code == 200
     alerts = response.json()
@@ -92,23 +116,41 @@ def test_get_alerts_with_filters():
     print("\nTesting /getAlerts with filters...")
     
     # Filter by user
-    response = requests.get(f"{BASE_URL}/getAlerts", params={"user_id": "staff001"})
+    response = SESSION.get(f"{BASE_URL}/getAlerts", params={"user_id": "staff001"})
     assert response.status_code == 200
     alerts = response.json()
     print(f"Found {len(alerts)} alerts for staff001")
     
     # Filter by level
-    response = requests.get(f"{BASE_URL}/getAlerts", params={"alert_level": "HIGH"})
+    response = SESSION.get(f"{BASE_URL}/getAlerts", params={"alert_level": "HIGH"})
     assert response.status_code == 200
     alerts = response.json()
     print(f"Found {len(alerts)} HIGH level alerts")
+    
+    # Filter by time with a UTC offset ("Z"), compared as naive UTC
+    response = SESSION.get(f"{BASE_URL}/getAlerts", params={"from_time": "2026-02-01T00:00:00Z"})
+    assert response.status_code == 200
+    alerts = response.json()
+    print(f"Found {len(alerts)} alerts since 2026-02-01T00:00:00Z")
+    
+    # Limit result size and follow the keyset cursor to the next page
+    response = SESSION.get(f"{BASE_URL}/getAlerts", params={"limit": 1})
+    assert response.status_code == 200
+    page = response.json()
+    assert len(page) <= 1
+    next_cursor = response.headers.get("X-Next-Cursor")
+    if next_cursor:
+        response = SESSION.get(f"{BASE_URL}/getAlerts", params={"limit": 1, "cursor": next_cursor})
+        assert response.status_code == 200
+        for alert in response.json():
+            assert (alert["generated_at"], alert["alert_id"]) < (page[0]["generated_at"], page[0]["alert_id"])
     print("✅ Filtered alerts test passed!")
 
 def test_get_user_risk():
     """Test getting user risk posture."""
     print("\nTesting /getUserRisk/{user_id} endpoint...")
     
-    response = requests.get(f"{BASE_URL}/getUserRisk/staff001")
+    response = SESSION.get(f"{BASE_URL}/getUserRisk/staff001")
     assert response.status_code == 200
     data = response.json()
     print(f"Response: {json.dumps(data, indent=2)}")
@@ -117,16 +159,42 @@ def test_get_user_risk():
     assert "role" in data
     assert "current_risk_score" in data
     assert "risk_level" in data
+    
+    # The high risk activity logged earlier updated the user's row
+    assert data["risk_level"] in ("MEDIUM", "HIGH")
+    assert data["current_risk_score"] >= 70
+    assert data["last_alert_time"] is not None
     print("✅ Get user risk test passed!")
 
 def test_get_user_risk_not_found():
     """Test getting risk for non-existent user."""
     print("\nTesting /getUserRisk for non-existent user...")
     
-    response = requests.get(f"{BASE_URL}/getUserRisk/nonexistent_user")
+    response = SESSION.get(f"{BASE_URL}/getUserRisk/nonexistent_user")
     assert response.status_code == 404
     print("✅ User not found test passed!")
 
+def test_refresh_policies():
+    """Test reloading role policies."""
+    print("\nTesting /refreshPolicies endpoint...")
+    
+    response = SESSION.post(f"{BASE_URL}/refreshPolicies")
+    assert response.status_code == 200
+    data = response.json()
+    print(f"Response: {json.dumps(data, indent=2)}")
+    
+    assert data["status"] == "refreshed"
+    assert data["policies_loaded"] == SEEDED_POLICIES
+    assert data["baselines_loaded"] == SEEDED_BASELINES
+    print("✅ Refresh policies test passed!")
+
+def run_concurrently(*tests):
+    """Run independent tests in parallel, re-raising the first failure."""
+    with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+        futures = [executor.submit(test) for test in tests]
+        for future in futures:
+            future.result()
+
 def run_all_tests():
     """Run all tests."""
     print("=" * 60)
@@ -135,12 +203,21 @@ def run_all_tests():
     
     try:
         test_health()
-        test_log_activity_high_risk()
-        test_log_activity_low_risk()
-        test_get_alerts()
-        test_get_alerts_with_filters()
-        test_get_user_risk()
-        test_get_user_risk_not_found()
+        
+        # Activity first so the read tests below see its alerts; tests within
+        # a phase are independent and run concurrently
+        run_concurrently(
+            test_log_activity_high_risk,
+            test_log_activity_low_risk,
+            test_log_activity_utc_offset
+        )
+        run_concurrently(
+            test_get_alerts,
+            test_get_alerts_with_filters,
+            test_get_user_risk,
+            test_get_user_risk_not_found,
+            test_refresh_policies
+        )
         
         print("\n" + "=" * 60)
         print("✅ ALL TESTS PASSED!")
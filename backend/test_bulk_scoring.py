@@ -0,0 +1,165 @@
+"""
+SECaaS Insider Threat Detection - Bulk Scoring Parity Tests
+
+Checks that the Numba kernel, the NumPy fallback and RiskDetector's
+per-activity checks give the same scores and reasons for the same input.
+Runs without a database: RiskDetector reads its user, baseline and daily
+access count from stubs.
+
+Run with: python -m pytest -q backend/test_bulk_scoring.py
+"""
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import backend.services.bulk_scoring as bulk_scoring
+import backend.services.risk_detector as risk_detector
+from backend.services.risk_detector import RiskDetector, RoleBaselineProfile
+
+ROWS = 5000
+
+POLICIES = frozenset({
+    (1, "READ", "Finance_Reports"),
+    (1, "WRITE", "*"),
+    (2, "READ", "General_Documents")
+})
+
+
+class _DailyAccessSession:
+    """Stands in for AsyncSession: answers the daily access count query."""
+    
+    def __init__(self, access_count: int):
+        self.access_count = access_count
+    
+    async def scalar(self, statement, params=None):
+        return self.access_count
+
+
+class _StubbedRiskDetector(RiskDetector):
+    """RiskDetector with a fixed user and role baseline instead of lookups."""
+    
+    def __init__(self, db, user, role_baseline):
+        super().__init__(db)
+        self.user = user
+        self.role_baseline = role_baseline
+    
+    async def get_user_profile(self, user_id):
+        return self.user, None, self.role_baseline
+
+
+def _random_activities(seed: int) -> dict:
+    """Build seeded random activity columns, as load_activity_columns returns them."""
+    rng = np.random.default_rng(seed)
+    status = rng.choice(np.array(["active"] * 9 + ["locked"], dtype=object), ROWS)
+    return {
+        "role_id": rng.integers(1, 4, ROWS),
+        "action": rng.choice(np.array(["READ", "WRITE", "DELETE"], dtype=object), ROWS),
+        "resource": rng.choice(np.array(["Finance_Reports", "General_Documents", "Own_Work"], dtype=object), ROWS),
+        "records_accessed": rng.integers(0, 250, ROWS),
+        "hour": rng.integers(0, 24, ROWS),
+        "minute": rng.integers(0, 60, ROWS),
+        "day_count": rng.integers(0, 100, ROWS),
+        "status": status,
+        "active": status == "active",
+        "has_baseline": rng.random(ROWS) > 0.1,
+        "baseline_records": rng.choice([0.0, 5.0, 10.5, 20.0], ROWS),
+        "baseline_per_day": rng.choice([0, 10, 20], ROWS),
+        "start_hour": rng.integers(0, 24, ROWS),
+        "end_hour": rng.integers(0, 24, ROWS)
+    }
+
+
+def _score_with_risk_detector(activities: dict):
+    """Score every row through RiskDetector.calculate_risk_score."""
+    
+    async def score_all():
+        scores, reasons = [], []
+        for i in range(ROWS):
+            role_baseline = RoleBaselineProfile(
+                float(activities["baseline_records"][i]),
+                int(activities["baseline_per_day"][i]),
+                int(activities["start_hour"][i]),
+                int(activities["end_hour"][i])
+            ) if activities["has_baseline"][i] else None
+            detector = _StubbedRiskDetector(
+                _DailyAccessSession(int(activities["day_count"][i])),
+                SimpleNamespace(role_id=int(activities["role_id"][i]), status=activities["status"][i]),
+                role_baseline
+            )
+            score, reason = await detector.calculate_risk_score(
+                "user",
+                activities["action"][i],
+                activities["resource"][i],
+                int(activities["records_accessed"][i]),
+                datetime(2026, 2, 2, int(activities["hour"][i]), int(activities["minute"][i]))
+            )
+            scores.append(score)
+            reasons.append(reason)
+        return np.array(scores), reasons
+    
+    return asyncio.run(score_all())
+
+
+@pytest.fixture(params=["default", "tuned"])
+def rule_weights(request, monkeypatch):
+    """
+    Run with the configured weights, and with weights high enough that
+    policy, records and off-hour alone reach the 100 cap.
+    """
+    monkeypatch.setattr(risk_detector, "_policy_set", POLICIES)
+    monkeypatch.setattr(risk_detector, "_policy_expires_at", float("inf"))
+    
+    if request.param == "tuned":
+        tiers = {
+            "_POLICY_VIOLATION_SCORE": 60,
+            "_RECORDS_TIERS": tuple((score, reason) for score, (_, reason) in zip((12, 20, 25), risk_detector._RECORDS_TIERS)),
+            "_OFF_HOUR_TIERS": tuple((score, reason) for score, (_, reason) in zip((15, 21, 30), risk_detector._OFF_HOUR_TIERS)),
+            "_FREQUENCY_TIERS": tuple((score, reason) for score, (_, reason) in zip((10, 14, 20), risk_detector._FREQUENCY_TIERS))
+        }
+        for name, value in tiers.items():
+            monkeypatch.setattr(risk_detector, name, value)
+            monkeypatch.setattr(bulk_scoring, name, value)
+        monkeypatch.setattr(bulk_scoring, "_TIER_SCORES", bulk_scoring._build_tier_scores())
+    
+    return request.param
+
+
+@pytest.mark.parametrize("seed", [7, 42])
+def test_numpy_fallback_matches_risk_detector(rule_weights, seed, monkeypatch):
+    """NumPy path (no Numba) gives RiskDetector's scores and reasons."""
+    monkeypatch.setattr(bulk_scoring, "_score_kernel", None)
+    activities = _random_activities(seed)
+    expected_scores, expected_reasons = _score_with_risk_detector(activities)
+    
+    scores, reasons = bulk_scoring.score_activities_bulk(activities, POLICIES)
+    
+    np.testing.assert_array_equal(scores, expected_scores)
+    assert reasons == expected_reasons
+    np.testing.assert_array_equal(
+        bulk_scoring.calculate_risk_scores_bulk(activities, POLICIES), expected_scores
+    )
+
+
+@pytest.mark.skipif(not bulk_scoring.NUMBA_AVAILABLE, reason="numba not installed")
+@pytest.mark.parametrize("seed", [7, 42])
+def test_numba_kernel_matches_risk_detector(rule_weights, seed):
+    """Numba kernel gives RiskDetector's scores and reasons."""
+    activities = _random_activities(seed)
+    expected_scores, expected_reasons = _score_with_risk_detector(activities)
+    
+    scores, reasons = bulk_scoring.score_activities_bulk(activities, POLICIES)
+    
+    np.testing.assert_array_equal(scores, expected_scores)
+    assert reasons == expected_reasons
+
+
+@pytest.mark.parametrize("rule_weights", ["tuned"], indirect=True)
+def test_tuned_weights_reach_cap(rule_weights):
+    """The tuned weights really exercise the skip-frequency-at-100 rule."""
+    activities = _random_activities(7)
+    tiers = bulk_scoring._rule_tiers(activities, bulk_scoring._policy_violations(activities, POLICIES))
+    
+    assert (bulk_scoring._TIER_SCORES[np.arange(3), tiers[:, :3]].sum(axis=1) >= 100).any()
@@ -20,9 +20,26 @@ CREATE TABLE users
 (
     user_id VARCHAR(50) PRIMARY KEY,
     role_id INTEGER NOT NULL REFERENCES roles(role_id),
-    status VARCHAR(20) NOT NULL DEFAULT 'active'
+    status VARCHAR(20) NOT NULL DEFAULT 'active',
+    -- Latest alert per user, maintained by the API when an alert is created
+    current_risk_score SMALLINT NOT NULL DEFAULT 0,
+    risk_level VARCHAR(10) NOT NULL DEFAULT 'LOW',
+    last_alert_time TIMESTAMP
 );
 
+-- Existing databases: add the latest-alert columns and backfill them
+-- ALTER TABLE users
+--     ADD COLUMN current_risk_score SMALLINT NOT NULL DEFAULT 0,
+--     ADD COLUMN risk_level VARCHAR(10) NOT NULL DEFAULT 'LOW',
+--     ADD COLUMN last_alert_time TIMESTAMP;
+-- UPDATE users u
+-- SET current_risk_score = a.risk_score, risk_level = a.alert_level, last_alert_time = a.generated_at
+-- FROM (
+--     SELECT DISTINCT ON (user_id) user_id, risk_score, alert_level, generated_at
+--     FROM alerts ORDER BY user_id, generated_at DESC, alert_id DESC
+-- ) a
+-- WHERE u.user_id = a.user_id;
+
 
 
 
@@ -57,6 +74,24 @@ CREATE TABLE activity_logs (
 -- Index for real-time & historical analysis
 CREATE INDEX idx_activity_logs_time ON activity_logs(access_time);
 
+-- Index for per-user daily access frequency checks
+CREATE INDEX ix_activity_logs_user_time ON activity_logs(user_id, access_time);
+
+
+
+
+-- Per-user daily activity counters (maintained by the API on ingestion)
+CREATE TABLE user_daily_access (
+    user_id VARCHAR(50) NOT NULL REFERENCES users(user_id),
+    day DATE NOT NULL,
+    access_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day)
+);
+
+-- Existing databases: backfill counters from logged activity
+-- INSERT INTO user_daily_access (user_id, day, access_count)
+-- SELECT user_id, access_time::date, COUNT(*) FROM activity_logs GROUP BY 1, 2;
+
 
 
 
@@ -77,12 +112,22 @@ CREATE TABLE role_baselines (
 CREATE TABLE alerts (
     alert_id SERIAL PRIMARY KEY,
     user_id VARCHAR(50) NOT NULL REFERENCES users(user_id),
-    risk_score NUMERIC(5,2) NOT NULL CHECK (risk_score BETWEEN 0 AND 100),
+    risk_score SMALLINT NOT NULL CHECK (risk_score BETWEEN 0 AND 100),
     alert_level VARCHAR(10) NOT NULL CHECK (alert_level IN ('LOW', 'MEDIUM', 'HIGH')),
     reasons TEXT NOT NULL,
     generated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Existing databases created with NUMERIC(5,2) risk scores:
+-- ALTER TABLE alerts ALTER COLUMN risk_score TYPE SMALLINT USING risk_score::smallint;
+
+-- Indexes for alert queries (per-user and per-level, newest first)
+CREATE INDEX ix_alerts_user_generated ON alerts(user_id, generated_at DESC);
+CREATE INDEX ix_alerts_level_generated ON alerts(alert_level, generated_at DESC);
+
+-- Index for keyset pagination of /getAlerts (newest first, alert_id tie-break)
+CREATE INDEX ix_alerts_generated_id ON alerts(generated_at DESC, alert_id DESC);
+
 
 
 